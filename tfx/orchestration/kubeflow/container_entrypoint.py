@@ -40,6 +40,7 @@ from tfx.types import standard_artifacts
 from tfx.utils import telemetry_utils
 
 from google.protobuf import json_format
+from google.protobuf.internal import api_implementation
 from ml_metadata.proto import metadata_store_pb2
 
 _KFP_POD_NAME_ENV_KEY = 'KFP_POD_NAME'
@@ -441,6 +442,9 @@ def main(argv):
   # the user.
   logging.basicConfig(stream=sys.stdout, level=logging.INFO)
   logging.getLogger().setLevel(logging.INFO)
+  # Publishing executions is considerably slower with the pure Python protobuf
+  # implementation, so make the one in use visible in the logs.
+  logging.info('Using protobuf implementation: %s', api_implementation.Type())
 
   parser = argparse.ArgumentParser()
   parser.add_argument('--pipeline_root', type=str, required=True)
@@ -12,19 +12,35 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Portable library for registering and publishing executions."""
+import copy
+import os
 from typing import Mapping, Optional, Sequence
-import uuid
+import weakref
 
 from tfx import types
 from tfx.orchestration import data_types_utils
 from tfx.orchestration import metadata
 from tfx.orchestration.portable import merge_utils
+from tfx.orchestration.portable.mlmd import common_utils
 from tfx.orchestration.portable.mlmd import execution_lib
 from tfx.proto.orchestration import execution_result_pb2
 from tfx.utils import typing_utils
 
 from ml_metadata.proto import metadata_store_pb2
 
+_STATE_CACHED = metadata_store_pb2.Execution.CACHED
+_STATE_COMPLETE = metadata_store_pb2.Execution.COMPLETE
+_STATE_FAILED = metadata_store_pb2.Execution.FAILED
+_STATE_RUNNING = metadata_store_pb2.Execution.RUNNING
+_EVENT_INTERNAL_OUTPUT = metadata_store_pb2.Event.INTERNAL_OUTPUT
+
+# Ids of the execution types already registered through an MLMD store, keyed
+# by the serialized ExecutionType. The cache is per store rather than per
+# metadata handle, since a handle opens a new store (which may be backed by a
+# new database, e.g. in-memory SQLite) every time it is entered. Entries go
+# away with their store.
+_execution_type_ids = weakref.WeakKeyDictionary()
+
 
 def publish_cached_executions(
     metadata_handle: metadata.Metadata,
@@ -44,7 +60,7 @@ def publish_cached_executions(
       artifact will be linked with the execution through an event of type OUTPUT
   """
   for execution in executions:
-    execution.last_known_state = metadata_store_pb2.Execution.CACHED
+    execution.last_known_state = _STATE_CACHED
 
   execution_lib.put_executions(
       metadata_handle,
@@ -59,14 +75,204 @@ def set_execution_result_if_not_empty(
     execution: metadata_store_pb2.Execution,
 ) -> None:
   """Sets execution result as a custom property of the execution."""
-  if executor_output and (
-      executor_output.execution_result.result_message
-      or executor_output.execution_result.metadata_details
-      or executor_output.execution_result.code
+  if executor_output is None or not executor_output.HasField(
+      'execution_result'
+  ):
+    return
+  execution_result = executor_output.execution_result
+  if (
+      execution_result.result_message
+      or execution_result.metadata_details
+      or execution_result.code
+  ):
+    execution_lib.set_execution_result(execution_result, execution)
+
+
+def _get_execution_by_id(
+    metadata_handle: metadata.Metadata, execution_id: int
+) -> metadata_store_pb2.Execution:
+  """Reads a single execution from MLMD.
+
+  Args:
+    metadata_handle: A handler to access MLMD.
+    execution_id: The id of the execution.
+
+  Returns:
+    The execution with id `execution_id`.
+
+  Raises:
+    ValueError: if the execution cannot be found in MLMD.
+  """
+  executions = metadata_handle.store.get_executions_by_id([execution_id])
+  if not executions:
+    raise ValueError(f'Execution {execution_id} not found in MLMD.')
+  return executions[0]
+
+
+def _get_executions_by_ids(
+    metadata_handle: metadata.Metadata, execution_ids: Sequence[int]
+) -> list[metadata_store_pb2.Execution]:
+  """Reads executions from MLMD with a single call.
+
+  Args:
+    metadata_handle: A handler to access MLMD.
+    execution_ids: The ids of the executions.
+
+  Returns:
+    The executions, in the same order as `execution_ids`.
+
+  Raises:
+    ValueError: if some of the executions cannot be found in MLMD.
+  """
+  executions_by_id = {
+      execution.id: execution
+      for execution in metadata_handle.store.get_executions_by_id(
+          execution_ids
+      )
+  }
+  missing_ids = [i for i in execution_ids if i not in executions_by_id]
+  if missing_ids:
+    raise ValueError(f'Executions not found in MLMD: {missing_ids}.')
+  return [executions_by_id[i] for i in execution_ids]
+
+
+def _get_output_artifacts_to_publish(
+    output_artifacts: Optional[typing_utils.ArtifactMultiMap],
+    executor_output: Optional[execution_result_pb2.ExecutorOutput],
+) -> typing_utils.ArtifactMultiMap:
+  """Merges executor output into output artifacts and marks them PUBLISHED."""
+  unpacked_output_artifacts = None
+  if executor_output is not None and executor_output.output_artifacts:
+    unpacked_output_artifacts = (
+        data_types_utils.unpack_executor_output_artifacts(
+            executor_output.output_artifacts
+        )
+    )
+
+  reference_state = types.artifact.ArtifactState.REFERENCE
+  published_state = types.artifact.ArtifactState.PUBLISHED
+  # TODO(b/300541196): Investigate if/how this affects governance.
+  # We don't want to create an OUTPUT_EVENT for the REFERENCE artifact used for
+  # intermediate artifact emission. However, a PENDING_OUTPUT_EVENT created by
+  # the governance task scheduler will remain in MLMD.
+  # Keys whose artifacts are all filtered out are kept with an empty list, as
+  # callers rely on the returned dict having the same keys as the outputs.
+  if unpacked_output_artifacts is None:
+    # Nothing to merge, so instead of having merge_utils copy every artifact,
+    # only the artifacts to publish are copied. The caller's artifacts are
+    # never modified.
+    output_artifacts_to_publish = {
+        key: [copy.deepcopy(a) for a in artifacts if a.state != reference_state]
+        for key, artifacts in (output_artifacts or {}).items()
+    }
+  else:
+    # TODO(b/300541907) Address corner case if the node returns an
+    # ExecutorOutput that contains new or updated artifacts for the
+    # intermediate output key, which is not supported.
+    merged_output_artifacts = merge_utils.merge_updated_output_artifacts(
+        output_artifacts, unpacked_output_artifacts
+    )
+    output_artifacts_to_publish = {
+        key: [a for a in artifacts if a.state != reference_state]
+        for key, artifacts in merged_output_artifacts.items()
+    }
+  # Mark output artifacts as PUBLISHED (LIVE in MLMD) if they were not in state
+  # REFERENCE.
+  for artifacts in output_artifacts_to_publish.values():
+    for artifact in artifacts:
+      artifact.state = published_state
+  return output_artifacts_to_publish
+
+
+def _set_succeeded_execution_fields(
+    execution: metadata_store_pb2.Execution,
+    executor_output: Optional[execution_result_pb2.ExecutorOutput],
+) -> None:
+  """Marks the execution COMPLETE and records the executor output on it."""
+  execution.last_known_state = _STATE_COMPLETE
+  if executor_output is not None:
+    # Copies the properties one by one rather than merging the map fields, as
+    # merging maps of different messages crashes the C++ protobuf 3.20 backend.
+    for key, value in executor_output.execution_properties.items():
+      execution.custom_properties[key].CopyFrom(value)
+  set_execution_result_if_not_empty(executor_output, execution)
+
+
+def publish_succeeded_executions(
+    metadata_handle: metadata.Metadata,
+    execution_ids: Sequence[int],
+    contexts: Sequence[metadata_store_pb2.Context],
+    output_artifacts_maps: Optional[
+        Sequence[Optional[typing_utils.ArtifactMultiMap]]
+    ] = None,
+    executor_outputs: Optional[
+        Sequence[Optional[execution_result_pb2.ExecutorOutput]]
+    ] = None,
+) -> tuple[
+    list[typing_utils.ArtifactMultiMap],
+    list[metadata_store_pb2.Execution],
+]:
+  """Marks a batch of existing executions as success.
+
+  This is the batched version of `publish_succeeded_execution`. The executions
+  are read from MLMD with a single `get_executions_by_id` call and written back
+  with a single `execution_lib.put_executions` call (PutLineageSubgraph),
+  instead of one round trip per execution.
+
+  Args:
+    metadata_handle: A handler to access MLMD.
+    execution_ids: The ids of the executions to mark successful.
+    contexts: MLMD contexts to associated with all the executions.
+    output_artifacts_maps: A list of output artifacts skeletons, one for each
+      execution in `execution_ids`. See `publish_succeeded_execution`.
+    executor_outputs: A list of executor outputs, one for each execution in
+      `execution_ids`. See `publish_succeeded_execution`.
+
+  Returns:
+    The tuple containing the list of maybe updated output artifacts and the list
+    of written executions, both in the same order as `execution_ids`.
+  Raises:
+    ValueError: if the lengths of the arguments mismatch, `execution_ids`
+      contains duplicates or an execution cannot be found in MLMD.
+    RuntimeError: if the executor output to a output channel is partial.
+  """
+  num_executions = len(execution_ids)
+  if len(set(execution_ids)) != num_executions:
+    raise ValueError(f'Duplicate execution ids found in {execution_ids}.')
+  if output_artifacts_maps is None:
+    output_artifacts_maps = [None] * num_executions
+  elif len(output_artifacts_maps) != num_executions:
+    raise ValueError(
+        f'The number of executions {num_executions} should be the same as '
+        f'the number of output ArtifactMultiMap {len(output_artifacts_maps)}.')
+  if executor_outputs is None:
+    executor_outputs = [None] * num_executions
+  elif len(executor_outputs) != num_executions:
+    raise ValueError(
+        f'The number of executions {num_executions} should be the same as '
+        f'the number of ExecutorOutput {len(executor_outputs)}.')
+  if not num_executions:
+    return [], []
+
+  executions = _get_executions_by_ids(metadata_handle, execution_ids)
+
+  output_artifacts_to_publish_list = []
+  for execution, output_artifacts, executor_output in zip(
+      executions, output_artifacts_maps, executor_outputs
   ):
-    execution_lib.set_execution_result(
-        executor_output.execution_result, execution
+    output_artifacts_to_publish_list.append(
+        _get_output_artifacts_to_publish(output_artifacts, executor_output)
     )
+    _set_succeeded_execution_fields(execution, executor_output)
+
+  executions = execution_lib.put_executions(
+      metadata_handle,
+      executions,
+      contexts,
+      output_artifacts_maps=output_artifacts_to_publish_list,
+  )
+
+  return output_artifacts_to_publish_list, list(executions)
 
 
 def publish_succeeded_execution(
@@ -109,44 +315,11 @@ def publish_succeeded_execution(
   Raises:
     RuntimeError: if the executor output to a output channel is partial.
   """
-  unpacked_output_artifacts = (
-      None  # pylint: disable=g-long-ternary
-      if executor_output is None
-      else (
-          data_types_utils.unpack_executor_output_artifacts(
-              executor_output.output_artifacts
-          )
-      )
-  )
-  # TODO(b/300541907) Address corner case if the node returns an ExecutorOutput
-  # that contains new or updated artifacts for the intermediate output key,
-  # which is not supported.
-  merged_output_artifacts = merge_utils.merge_updated_output_artifacts(
-      output_artifacts, unpacked_output_artifacts
+  output_artifacts_to_publish = _get_output_artifacts_to_publish(
+      output_artifacts, executor_output
   )
-
-  output_artifacts_to_publish = {}
-  for key, artifacts in merged_output_artifacts.items():
-    output_artifacts_to_publish[key] = []
-    for artifact in artifacts:
-      if artifact.state != types.artifact.ArtifactState.REFERENCE:
-        # Mark output artifact as PUBLISHED (LIVE in MLMD) if it was not in
-        # state REFERENCE.
-        artifact.state = types.artifact.ArtifactState.PUBLISHED
-
-        # TODO(b/300541196): Investigate if/how this affects governance.
-        # We don't want to create an OUTPUT_EVENT for the REFERENCE artifact
-        # used for intermediate artifact emission. However, a
-        # PENDING_OUTPUT_EVENT created by the governance task scheduler will
-        # remain in MLMD.
-        output_artifacts_to_publish[key].append(artifact)
-
-  [execution] = metadata_handle.store.get_executions_by_id([execution_id])
-  execution.last_known_state = metadata_store_pb2.Execution.COMPLETE
-  if executor_output:
-    for key, value in executor_output.execution_properties.items():
-      execution.custom_properties[key].CopyFrom(value)
-  set_execution_result_if_not_empty(executor_output, execution)
+  execution = _get_execution_by_id(metadata_handle, execution_id)
+  _set_succeeded_execution_fields(execution, executor_output)
 
   execution = execution_lib.put_execution(
       metadata_handle,
@@ -158,11 +331,28 @@ def publish_succeeded_execution(
   return output_artifacts_to_publish, execution
 
 
+def _get_execution_if_not_provided(
+    metadata_handle: metadata.Metadata,
+    execution_id: int,
+    execution: Optional[metadata_store_pb2.Execution],
+) -> metadata_store_pb2.Execution:
+  """Returns `execution` if given, otherwise reads it from MLMD by id."""
+  if execution is None:
+    execution = _get_execution_by_id(metadata_handle, execution_id)
+  elif execution.id != execution_id:
+    raise ValueError(
+        f'Execution id {execution.id} does not match execution_id '
+        f'{execution_id}.'
+    )
+  return execution
+
+
 def publish_failed_execution(
     metadata_handle: metadata.Metadata,
     contexts: Sequence[metadata_store_pb2.Context],
     execution_id: int,
     executor_output: Optional[execution_result_pb2.ExecutorOutput] = None,
+    execution: Optional[metadata_store_pb2.Execution] = None,
 ) -> None:
   """Marks an existing execution as failed.
 
@@ -171,9 +361,17 @@ def publish_failed_execution(
     contexts: MLMD contexts to associated with the execution.
     execution_id: The id of the execution.
     executor_output: The output of executor.
+    execution: Optional execution with id `execution_id` that the caller
+      already holds (e.g. returned by `register_execution`). If provided, the
+      execution will not be read again from MLMD.
+
+  Raises:
+    ValueError: if the id of `execution` does not match `execution_id`.
   """
-  [execution] = metadata_handle.store.get_executions_by_id([execution_id])
-  execution.last_known_state = metadata_store_pb2.Execution.FAILED
+  execution = _get_execution_if_not_provided(
+      metadata_handle, execution_id, execution
+  )
+  execution.last_known_state = _STATE_FAILED
   set_execution_result_if_not_empty(executor_output, execution)
 
   execution_lib.put_execution(metadata_handle, execution, contexts)
@@ -184,6 +382,7 @@ def publish_internal_execution(
     contexts: Sequence[metadata_store_pb2.Context],
     execution_id: int,
     output_artifacts: Optional[typing_utils.ArtifactMultiMap] = None,
+    execution: Optional[metadata_store_pb2.Execution] = None,
 ) -> None:
   """Marks an exeisting execution as as success and links its output to an INTERNAL_OUTPUT event.
 
@@ -193,26 +392,83 @@ def publish_internal_execution(
     execution_id: The id of the execution.
     output_artifacts: Output artifacts of the execution. Each artifact will be
       linked with the execution through an event with type INTERNAL_OUTPUT.
+    execution: Optional execution with id `execution_id` that the caller
+      already holds (e.g. returned by `register_execution`). If provided, the
+      execution will not be read again from MLMD.
+
+  Raises:
+    ValueError: if the id of `execution` does not match `execution_id`.
   """
-  [execution] = metadata_handle.store.get_executions_by_id([execution_id])
-  execution.last_known_state = metadata_store_pb2.Execution.COMPLETE
+  execution = _get_execution_if_not_provided(
+      metadata_handle, execution_id, execution
+  )
+  execution.last_known_state = _STATE_COMPLETE
 
   execution_lib.put_execution(
       metadata_handle,
       execution,
       contexts,
       output_artifacts=output_artifacts,
-      output_event_type=metadata_store_pb2.Event.INTERNAL_OUTPUT,
+      output_event_type=_EVENT_INTERNAL_OUTPUT,
   )
 
 
+def _generate_execution_name() -> str:
+  """Generates a random execution name in the canonical UUID string format.
+
+  This is cheaper than `str(uuid.uuid4())` as it skips constructing a UUID
+  object, while drawing from the same `os.urandom` source and keeping the
+  string layout of other execution names in MLMD.
+
+  Returns:
+    A random string of the form xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx.
+  """
+  h = os.urandom(16).hex()
+  return f'{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}'
+
+
+def _get_execution_type_with_id(
+    metadata_handle: metadata.Metadata,
+    execution_type: metadata_store_pb2.ExecutionType,
+) -> metadata_store_pb2.ExecutionType:
+  """Returns the execution type with its MLMD id populated.
+
+  Pipelines register executions of the same few types many times, so the type
+  ids are cached per MLMD store to avoid looking the type up in MLMD on every
+  registration. The cache is keyed by the whole serialized type, so a
+  type with a changed schema still goes through registration.
+
+  Args:
+    metadata_handle: A handler to access MLMD.
+    execution_type: The type of the execution. Not modified.
+
+  Returns:
+    `execution_type` itself if it already has an id, otherwise a copy of it
+    with the id of the registered type.
+  """
+  if execution_type.id:
+    return execution_type
+  type_ids = _execution_type_ids.setdefault(metadata_handle.store, {})
+  key = execution_type.SerializeToString(deterministic=True)
+  type_id = type_ids.get(key)
+  if type_id is None:
+    type_id = common_utils.register_type_if_not_exist(
+        metadata_handle, execution_type
+    ).id
+    type_ids[key] = type_id
+  result = metadata_store_pb2.ExecutionType()
+  result.CopyFrom(execution_type)
+  result.id = type_id
+  return result
+
+
 def register_execution(
     metadata_handle: metadata.Metadata,
     execution_type: metadata_store_pb2.ExecutionType,
     contexts: Sequence[metadata_store_pb2.Context],
     input_artifacts: Optional[typing_utils.ArtifactMultiMap] = None,
     exec_properties: Optional[Mapping[str, types.ExecPropertyTypes]] = None,
-    last_known_state: metadata_store_pb2.Execution.State = metadata_store_pb2.Execution.RUNNING,
+    last_known_state: metadata_store_pb2.Execution.State = _STATE_RUNNING,
 ) -> metadata_store_pb2.Execution:
   """Registers a new execution in MLMD.
 
@@ -236,7 +492,8 @@ def register_execution(
   # registered in MLMD. If there is a RPC retry, AlreadyExistError will raise.
   # After this fix (b/221103319), AlreadyExistError may not raise. Instead,
   # execution may be updated again upon RPC retries.
-  exec_name = str(uuid.uuid4())
+  exec_name = _generate_execution_name()
+  execution_type = _get_execution_type_with_id(metadata_handle, execution_type)
   execution = execution_lib.prepare_execution(
       metadata_handle,
       execution_type,
@@ -13,6 +13,7 @@
 # limitations under the License.
 """Tests for tfx.orchestration.portable.execution_publish_utils."""
 import copy
+from unittest import mock
 
 from absl.testing import parameterized
 import tensorflow as tf
@@ -115,6 +116,43 @@ class ExecutionPublisherTest(test_case_utils.TfxTest, parameterized.TestCase):
           [c.id for c in contexts],
           [c.id for c in m.store.get_contexts_by_artifact(input_example.id)])
 
+  def testRegisterExecutionCachesExecutionTypeId(self):
+    with metadata.Metadata(connection_config=self._connection_config) as m:
+      contexts = self._generate_contexts(m)
+      executions = [
+          execution_publish_utils.register_execution(
+              m, self._execution_type, contexts, exec_properties={'p1': 0})
+      ]
+      with mock.patch.object(
+          m.store, 'get_execution_type',
+          wraps=m.store.get_execution_type) as mock_get_execution_type:
+        executions.extend(
+            execution_publish_utils.register_execution(
+                m, self._execution_type, contexts, exec_properties={'p1': i})
+            for i in range(1, 3)
+        )
+        mock_get_execution_type.assert_not_called()
+      self.assertLen({e.type_id for e in executions}, 1)
+      self.assertEqual(
+          m.store.get_execution_type('my_ex_type').id, executions[0].type_id)
+      # The execution type passed in by the caller is not modified.
+      self.assertFalse(self._execution_type.HasField('id'))
+
+  def testRegisterExecutionGeneratesUniqueNames(self):
+    with metadata.Metadata(connection_config=self._connection_config) as m:
+      contexts = self._generate_contexts(m)
+      names = [
+          execution_publish_utils.register_execution(
+              m, self._execution_type, contexts
+          ).name
+          for _ in range(3)
+      ]
+      self.assertLen(set(names), 3)
+      for name in names:
+        self.assertRegex(
+            name, r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-'
+            r'[0-9a-f]{12}$')
+
   def testPublishCachedExecution(self):
     with metadata.Metadata(connection_config=self._connection_config) as m:
       contexts = self._generate_contexts(m)
@@ -284,6 +322,25 @@ class ExecutionPublisherTest(test_case_utils.TfxTest, parameterized.TestCase):
               c.id for c in m.store.get_contexts_by_artifact(output_example.id)
           ])
 
+  def testPublishSuccessfulExecutionDoesNotModifyOutputArtifacts(self):
+    with metadata.Metadata(connection_config=self._connection_config) as m:
+      contexts = self._generate_contexts(m)
+      execution_id = execution_publish_utils.register_execution(
+          m, self._execution_type, contexts).id
+      output_example = standard_artifacts.Examples()
+      output_example.uri = '/examples_uri'
+      original_mlmd_artifact = copy.deepcopy(output_example.mlmd_artifact)
+      output_dict, _ = execution_publish_utils.publish_succeeded_execution(
+          m, execution_id, contexts, {'examples': [output_example]})
+      self.assertEqual(original_mlmd_artifact, output_example.mlmd_artifact)
+      [published_example] = output_dict['examples']
+      self.assertIsNot(output_example, published_example)
+      self.assertEqual(
+          tfx_artifact.ArtifactState.PUBLISHED, published_example.state)
+      [artifact] = m.store.get_artifacts()
+      self.assertEqual(published_example.id, artifact.id)
+      self.assertEqual(metadata_store_pb2.Artifact.LIVE, artifact.state)
+
   def testPublishSuccessfulExecutionWithRuntimeResolvedUri(self):
     with metadata.Metadata(connection_config=self._connection_config) as m:
       contexts = self._generate_contexts(m)
@@ -642,6 +699,114 @@ class ExecutionPublisherTest(test_case_utils.TfxTest, parameterized.TestCase):
           ],
       )
 
+  def testPublishSuccessExecutionOverwritesExistingCustomProperties(self):
+    with metadata.Metadata(connection_config=self._connection_config) as m:
+      executor_output = text_format.Parse(
+          """
+          execution_properties {
+            key: "prop"
+            value {
+              int_value: 1
+            }
+          }
+          """, execution_result_pb2.ExecutorOutput())
+      contexts = self._generate_contexts(m)
+      execution_id = execution_publish_utils.register_execution(
+          m, self._execution_type, contexts,
+          exec_properties={'prop': 'old_value', 'other': 'other_value'}).id
+      execution_publish_utils.publish_succeeded_execution(
+          m, execution_id, contexts, {}, executor_output)
+      [execution] = m.store.get_executions_by_id([execution_id])
+      self.assertProtoPartiallyEquals(
+          """
+          id: 1
+          last_known_state: COMPLETE
+          custom_properties {
+            key: "other"
+            value {
+              string_value: "other_value"
+            }
+          }
+          custom_properties {
+            key: "prop"
+            value {
+              int_value: 1
+            }
+          }
+          """,
+          execution,
+          ignored_fields=[
+              'type_id',
+              'type',
+              'create_time_since_epoch',
+              'last_update_time_since_epoch',
+              'name',
+          ],
+      )
+
+  def testPublishSucceededExecutions(self):
+    with metadata.Metadata(connection_config=self._connection_config) as m:
+      contexts = self._generate_contexts(m)
+      execution_ids = [
+          execution_publish_utils.register_execution(
+              m, self._execution_type, contexts
+          ).id
+          for _ in range(2)
+      ]
+      output_example_1 = standard_artifacts.Examples()
+      output_example_1.uri = '/examples_uri_1'
+      output_example_2 = standard_artifacts.Examples()
+      output_example_2.uri = '/examples_uri_2'
+      executor_output = text_format.Parse(
+          """
+          execution_properties {
+            key: "int"
+            value {
+              int_value: 1
+            }
+          }
+          """, execution_result_pb2.ExecutorOutput())
+      output_dicts, executions = (
+          execution_publish_utils.publish_succeeded_executions(
+              m,
+              # Reversed to verify the results follow the order of the ids.
+              execution_ids[::-1],
+              contexts,
+              [{'examples': [output_example_2]},
+               {'examples': [output_example_1]}],
+              [None, executor_output],
+          )
+      )
+      self.assertEqual(execution_ids[::-1], [e.id for e in executions])
+      self.assertEqual(
+          '/examples_uri_2', output_dicts[0]['examples'][0].uri
+      )
+      self.assertEqual(
+          '/examples_uri_1', output_dicts[1]['examples'][0].uri
+      )
+      [execution_1, execution_2] = m.store.get_executions_by_id(execution_ids)
+      self.assertEqual(
+          metadata_store_pb2.Execution.COMPLETE, execution_1.last_known_state
+      )
+      self.assertEqual(
+          metadata_store_pb2.Execution.COMPLETE, execution_2.last_known_state
+      )
+      self.assertEqual(1, execution_1.custom_properties['int'].int_value)
+      self.assertNotIn('int', execution_2.custom_properties)
+      self.assertCountEqual(
+          [output_dict['examples'][0].id for output_dict in output_dicts],
+          [event.artifact_id for event in m.store.get_events_by_execution_ids(
+              execution_ids)])
+
+  def testPublishSucceededExecutionsFailsOnLengthMismatch(self):
+    with metadata.Metadata(connection_config=self._connection_config) as m:
+      contexts = self._generate_contexts(m)
+      execution_id = execution_publish_utils.register_execution(
+          m, self._execution_type, contexts).id
+      with self.assertRaisesRegex(ValueError, 'should be the same'):
+        execution_publish_utils.publish_succeeded_executions(
+            m, [execution_id], contexts, output_artifacts_maps=[{}, {}])
+
   def testPublishSuccessExecutionRecordExecutionResult(self):
     with metadata.Metadata(connection_config=self._connection_config) as m:
       executor_output = text_format.Parse(
@@ -760,6 +925,36 @@ class ExecutionPublisherTest(test_case_utils.TfxTest, parameterized.TestCase):
           [c.id for c in contexts],
           [c.id for c in m.store.get_contexts_by_execution(execution.id)])
 
+  def testPublishFailedExecutionWithPrefetchedExecution(self):
+    with metadata.Metadata(connection_config=self._connection_config) as m:
+      contexts = self._generate_contexts(m)
+      execution = execution_publish_utils.register_execution(
+          m, self._execution_type, contexts)
+      with mock.patch.object(
+          m.store, 'get_executions_by_id',
+          wraps=m.store.get_executions_by_id) as mock_get_executions_by_id:
+        execution_publish_utils.publish_failed_execution(
+            m, contexts, execution.id, execution=execution)
+        mock_get_executions_by_id.assert_not_called()
+      [execution] = m.store.get_executions_by_id([execution.id])
+      self.assertEqual(
+          metadata_store_pb2.Execution.FAILED, execution.last_known_state)
+
+  def testPublishFailedExecutionFailsOnUnknownExecution(self):
+    with metadata.Metadata(connection_config=self._connection_config) as m:
+      contexts = self._generate_contexts(m)
+      with self.assertRaisesRegex(ValueError, 'not found in MLMD'):
+        execution_publish_utils.publish_failed_execution(m, contexts, 1)
+
+  def testPublishInternalExecutionFailsOnMismatchedExecution(self):
+    with metadata.Metadata(connection_config=self._connection_config) as m:
+      contexts = self._generate_contexts(m)
+      execution = execution_publish_utils.register_execution(
+          m, self._execution_type, contexts)
+      with self.assertRaisesRegex(ValueError, 'does not match'):
+        execution_publish_utils.publish_internal_execution(
+            m, contexts, execution.id + 1, execution=execution)
+
   def testPublishInternalExecution(self):
     with metadata.Metadata(connection_config=self._connection_config) as m:
       contexts = self._generate_contexts(m)
@@ -280,6 +280,7 @@ class Launcher:
           self._publish_failed_execution(
               execution_id=execution.id,
               contexts=contexts,
+              execution=execution,
               executor_output=self._build_error_output(code=e.grpc_code_value))
         return _ExecutionPreparationResult(
             execution_info=self._build_execution_info(
@@ -313,6 +314,7 @@ class Launcher:
           self._publish_failed_execution(
               execution_id=execution.id,
               contexts=contexts,
+              execution=execution,
               executor_output=executor_output)
         return _ExecutionPreparationResult(
             execution_info=self._build_execution_info(
@@ -354,6 +356,7 @@ class Launcher:
           self._publish_failed_execution(
               execution_id=execution.id,
               contexts=contexts,
+              execution=execution,
               executor_output=self._build_error_output(code=e.grpc_code_value))
         return _ExecutionPreparationResult(
             execution_info=self._build_execution_info(
@@ -510,7 +513,8 @@ class Launcher:
       self,
       execution_id: int,
       contexts: List[metadata_store_pb2.Context],
-      executor_output: Optional[execution_result_pb2.ExecutorOutput] = None
+      executor_output: Optional[execution_result_pb2.ExecutorOutput] = None,
+      execution: Optional[metadata_store_pb2.Execution] = None,
   ) -> None:
     """Publishes failed execution to ml metadata."""
     with self._mlmd_connection as m:
@@ -519,6 +523,7 @@ class Launcher:
           execution_id=execution_id,
           contexts=contexts,
           executor_output=executor_output,
+          execution=execution,
       )
 
   def _clean_up_stateless_execution_info(
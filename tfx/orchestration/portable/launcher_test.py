@@ -396,6 +396,31 @@ class LauncherTest(test_case_utils.TfxTest):
           ],
       )
 
+  def testLauncher_InputNotReadyPublishesFailedExecutionWithoutReread(self):
+    test_launcher = launcher.Launcher(
+        pipeline_node=self._trainer,
+        mlmd_connection=self._mlmd_connection,
+        pipeline_info=self._pipeline_info,
+        pipeline_runtime_spec=self._pipeline_runtime_spec,
+        executor_spec=self._trainer_executor_spec,
+        custom_executor_operators=self._test_executor_operators)
+    mock_get_execution_by_id = self.enter_context(
+        mock.patch.object(
+            execution_publish_utils,
+            '_get_execution_by_id',
+            wraps=execution_publish_utils._get_execution_by_id,
+        )
+    )
+    test_launcher.launch()
+
+    # The execution registered by the launcher is passed in when publishing it
+    # as failed, so it is not read again from MLMD.
+    mock_get_execution_by_id.assert_not_called()
+    with self._mlmd_connection as m:
+      [execution] = m.store.get_executions()
+      self.assertEqual(
+          metadata_store_pb2.Execution.FAILED, execution.last_known_state)
+
   def testLauncher_InputPartiallyReady(self):
     # No new execution is triggered and registered if all inputs are not ready.
     LauncherTest.fakeUpstreamOutputs(self._mlmd_connection, self._example_gen,
@@ -90,6 +90,7 @@ class ResolverNodeHandler(system_node_handler.SystemNodeHandler):
             metadata_handle=m,
             contexts=contexts,
             execution_id=execution.id,
+            execution=execution,
             executor_output=self._build_error_output(code=e.grpc_code_value),
         )
         return data_types.ExecutionInfo(
@@ -117,6 +118,7 @@ class ResolverNodeHandler(system_node_handler.SystemNodeHandler):
             metadata_handle=m,
             contexts=contexts,
             execution_id=execution.id,
+            execution=execution,
             executor_output=self._build_error_output(
                 _ERROR_CODE_UNIMPLEMENTED,
                 'Handling more than one input dicts not implemented yet.',
@@ -137,6 +139,7 @@ class ResolverNodeHandler(system_node_handler.SystemNodeHandler):
           contexts=contexts,
           execution_id=execution.id,
           output_artifacts=input_artifacts,
+          execution=execution,
       )
 
       return data_types.ExecutionInfo(